@@ -1,27 +1,35 @@
 # app/api/routes.py
 
+import re
+
+from contextlib import ExitStack
+from functools import lru_cache
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+
 from fastapi import APIRouter, File, UploadFile, HTTPException, Form
 from fastapi.concurrency import run_in_threadpool
-from fastapi.encoders import jsonable_encoder
-from fastapi.responses import JSONResponse, PlainTextResponse
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 
 from app.config.settings import choose_prompt
 from app.models.enums import ModelName
-from app.services.audio_service import summarise_audio
-from app.services.doc_service import summarise_document_file
-from app.services.image_service import summarise_image_file
 from app.services.gpt_service import ask_gpt
-from app.services.ollama_service import ask_ollama
-from app.services.video_service import summarise_video
-from app.utils.file_utils import extract_ext_category
+from app.services.ollama_service import ask_ollama_async
+from app.utils.file_utils import extract_ext_category, persist_upload
+
+# The file services (ffmpeg, LibreOffice, vision payloads) are imported lazily
+# inside their branches: text-only traffic dominates and shouldn't pay their
+# import cost in worker startup time or per-fork RSS.
 
 router = APIRouter()
 
 VISION_MODELS = {"gpt-4o", "gpt-5", "gpt-4o-mini"}
+# Tuple form so _is_vision_model takes str.startswith's C fast path
+VISION_PREFIXES = tuple(VISION_MODELS)
 
 def _is_vision_model(name: str) -> bool:
     # Allow "-mini" variants if they support vision in your stack
-    return any(name.startswith(m) for m in VISION_MODELS)
+    return name.startswith(VISION_PREFIXES)
 
 @router.get("/healthz")
 def healthz():
@@ -33,17 +41,29 @@ def _nonblank(s: str) -> str:
         raise ValueError("Prompt cannot be empty or whitespace.")
     return s.strip()
 
+# Matches blank input or Swagger's 'string' placeholder in one C-level pass
+_PLACEHOLDER = re.compile(r"\A\s*(?:string)?\s*\Z", re.IGNORECASE)
+
+# Only short values are memoised: the cache retains raw client input for the
+# process lifetime, so a few large distinct queries must never pin memory.
+# Repeated prompts/placeholders — the case worth caching — sit well under this.
+_NORMALISE_CACHE_MAX_LEN = 512
+
+@lru_cache(maxsize=1024)
+def _normalise_short(v: str) -> str | None:
+    return None if _PLACEHOLDER.fullmatch(v) else v.strip()
+
 def _normalise_query(v: str | None) -> str | None:
     """
     Trim, convert empty/placeholder to None.
     Swagger UI often sends 'string' as a placeholder.
+    Short values are cached: prompts repeat heavily and this runs before any I/O.
     """
     if v is None:
         return None
-    v = v.strip()
-    if not v or v.lower() == "string":
-        return None
-    return v
+    if len(v) <= _NORMALISE_CACHE_MAX_LEN:
+        return _normalise_short(v)
+    return None if _PLACEHOLDER.fullmatch(v) else v.strip()
 
 @router.post("/ask")
 async def ask(
@@ -66,6 +86,9 @@ async def ask(
         description="Optional file upload (PDF, DOCX, TXT, etc.).",
     ),
 ):
+    # Oversize requests never reach here: MaxBodySizeMiddleware rejects them
+    # from the declared Content-Length before the multipart body is parsed.
+
     # --- Normalise Swagger oddities ---
     # Swagger can send 'file' as "" (string) or an UploadFile with empty filename.
     if isinstance(file, str) or (file and getattr(file, "filename", "") == ""):
@@ -77,7 +100,10 @@ async def ask(
     if not query and not file:
         raise HTTPException(status_code=422, detail="Provide at least query or file.")
 
-    if model.value.endswith("-transcribe"):
+    # Bind once: Enum attribute access is not free and we branch on it a lot below
+    model_value = model.value
+
+    if model_value.endswith("-transcribe"):
         raise HTTPException(
             status_code=422,
             detail="Selected model is a speech-to-text model. Choose from the models provided."
@@ -85,110 +111,128 @@ async def ask(
 
     category: str | None = None
 
-    # If a file is provided, validate its type and read it
-    file_bytes, filename = None, None
-    if file:
-        filename = file.filename
-        ext, category = extract_ext_category(filename)
-        if not ext:
-            raise HTTPException(
-                status_code=422,
-                detail="Unsupported file type. Allowed: video, audio, text, image, archive."
-            )
-        file_bytes = await file.read()
-
-    prompt = _normalise_query(prompt)
-    if not prompt:
-        prompt = choose_prompt(prompt)
-
-    # print("File category is: ", category)
-    # print("Filename is: ", filename)
-    # print("Prompt is: ", prompt)
-
-    try:
-        if file_bytes and (model.value == ModelName.deepseek_llm_7b.value):
-            raise HTTPException(
-                status_code=422,
-                detail="DeepSeek (Ollama) is currently enabled for text-only queries. Choose a GPT-* model for file summarisation."
-            )
-
-        # --- If it's a video, call video service and return immediately ---
-        if file_bytes and category == "video":
-            # Run the blocking ffmpeg/transcription pipeline off the event loop
-            summary = await run_in_threadpool(
-                summarise_video,
-                file_bytes,
-                filename,
-                prompt,
-                model.value,
-            )
-            return PlainTextResponse(content=summary)
-
-        # --- If it's an audio file, call audio service and return immediately ---
-        if file_bytes and category == "audio":
-            summary = await run_in_threadpool(
-                summarise_audio,
-                file_bytes,
-                filename,
-                prompt,
-                model.value,
-            )
-            # return JSONResponse(content=jsonable_encoder({"summary": summary}))
-            return PlainTextResponse(content=summary)
-
-        # # --- If an AV file is uploaded, route to the appropriate service once ---
-        # if file_bytes and category in {"video", "audio"}:
-        #     # Service registry: add more handlers here (e.g. "image": summarise_image)
-        #     handlers = {
-        #         "video": summarise_video,
-        #         "audio": summarise_audio,
-        #     }
-        #     handler = handlers.get(category)
-        #
-        #     summary = await run_in_threadpool(
-        #         handler,
-        #         file_bytes,
-        #         filename,
-        #         prompt,
-        #         model.value,
-        #     )
-        #     return JSONResponse(content=jsonable_encoder({"summary": summary}))
-
-        # --- If it's a document (PDF/Office/Text), call doc service and return immediately ---
-        if file_bytes and category == "text":
-            summary = await run_in_threadpool(
-                summarise_document_file,
-                file_bytes,
-                filename,
-                prompt,
-                model.value,
-            )
-            return PlainTextResponse(content=summary)
-
-        if file_bytes and category == "image":
-            if not _is_vision_model(model.value):
+    # If a file is provided, validate its type and stream it to disk.
+    # Streaming in 1 MiB chunks keeps peak memory flat regardless of upload size;
+    # the services receive a Path and never hold the whole file in RAM.
+    # The ExitStack owns the streamed temp file: cleanup is registered the
+    # moment the path exists, so a failure anywhere later — including during
+    # the persist itself — can't leak it (previously only the handler body
+    # proper was covered by the finally).
+    src_path, filename = None, None
+    with ExitStack() as cleanup:
+        if file:
+            filename = file.filename
+            ext, category = extract_ext_category(filename)
+            if not ext:
+                raise HTTPException(
+                    status_code=422,
+                    detail="Unsupported file type. Allowed: video, audio, text, image, archive."
+                )
+            tmp = NamedTemporaryFile(delete=False, suffix=Path(filename).suffix)
+            tmp.close()
+            src_path = Path(tmp.name)
+            cleanup.callback(src_path.unlink, missing_ok=True)
+            # Zero-copy persist (sendfile on Linux) straight from the spooled body
+            await run_in_threadpool(persist_upload, file.file, src_path)
+
+        prompt = _normalise_query(prompt)
+        if not prompt:
+            prompt = choose_prompt(prompt)
+
+        # print("File category is: ", category)
+        # print("Filename is: ", filename)
+        # print("Prompt is: ", prompt)
+
+        try:
+            if src_path and (model_value == ModelName.deepseek_llm_7b.value):
                 raise HTTPException(
                     status_code=422,
-                    detail=f"Model '{model.value}' is not vision-capable. Select a vision model (e.g., gpt-4o or gpt-5)."
+                    detail="DeepSeek (Ollama) is currently enabled for text-only queries. Choose a GPT-* model for file summarisation."
                 )
-            summary = await run_in_threadpool(
-                summarise_image_file, file_bytes, filename, prompt, model.value
+
+            # --- If it's a video, call video service and return immediately ---
+            if src_path and category == "video":
+                from app.services.video_service import summarise_video
+
+                # Async service: only the ffmpeg step runs off the event loop
+                summary = await summarise_video(
+                    src_path,
+                    filename,
+                    prompt,
+                    model_value,
+                )
+                return PlainTextResponse(content=summary)
+
+            # --- If it's an audio file, call audio service and return immediately ---
+            if src_path and category == "audio":
+                from app.services.audio_service import summarise_audio
+
+                # Fully async service: transcription segments pipeline on the event loop
+                summary = await summarise_audio(
+                    src_path,
+                    filename,
+                    prompt,
+                    model_value,
+                )
+                # return ORJSONResponse({"summary": summary})
+                return PlainTextResponse(content=summary)
+
+            # # --- If an AV file is uploaded, route to the appropriate service once ---
+            # if src_path and category in {"video", "audio"}:
+            #     # Service registry: add more handlers here (e.g. "image": summarise_image)
+            #     handlers = {
+            #         "video": summarise_video,
+            #         "audio": summarise_audio,
+            #     }
+            #     handler = handlers.get(category)
+            #
+            #     summary = await run_in_threadpool(
+            #         handler,
+            #         file_bytes,
+            #         filename,
+            #         prompt,
+            #         model.value,
+            #     )
+            #     return ORJSONResponse({"summary": summary})
+
+            # --- If it's a document (PDF/Office/Text), call doc service and return immediately ---
+            if src_path and category == "text":
+                from app.services.doc_service import summarise_document_file
+
+                summary = await summarise_document_file(
+                    src_path,
+                    filename,
+                    prompt,
+                    model_value,
+                )
+                return PlainTextResponse(content=summary)
+
+            if src_path and category == "image":
+                from app.services.image_service import summarise_image_file
+
+                if not _is_vision_model(model_value):
+                    raise HTTPException(
+                        status_code=422,
+                        detail=f"Model '{model_value}' is not vision-capable. Select a vision model (e.g., gpt-4o or gpt-5)."
+                    )
+                summary = await summarise_image_file(
+                    src_path, filename, prompt, model_value
+                )
+                return PlainTextResponse(content=summary)
+
+            # --- DeepSeek via Ollama: text-only (no files) ---
+            if (not src_path) and (model_value == ModelName.deepseek_llm_7b.value):
+                if not query:
+                    raise HTTPException(status_code=422, detail="Provide a non-empty query for the DeepSeek model.")
+                result = await ask_ollama_async(query=query, prompt=prompt)
+                return ORJSONResponse(result)
+
+            result = await ask_gpt(
+                query=query,
+                prompt=prompt,
+                summary_model=model_value
             )
-            return PlainTextResponse(content=summary)
-
-        # --- DeepSeek via Ollama: text-only (no files) ---
-        if (not file_bytes) and (model.value == ModelName.deepseek_llm_7b.value):
-            if not query:
-                raise HTTPException(status_code=422, detail="Provide a non-empty query for the DeepSeek model.")
-            result = ask_ollama(query=query, prompt=prompt)
-            return JSONResponse(content=jsonable_encoder(result))
-
-        result = ask_gpt(
-            query=query,
-            prompt=prompt,
-            summary_model=model.value
-        )
-        return JSONResponse(content=jsonable_encoder(result))
-    except Exception as e:
-        # Avoid leaking internals; return the message for now
-        raise HTTPException(status_code=500, detail=str(e))
+            return ORJSONResponse(result)
+        except Exception as e:
+            # Avoid leaking internals; return the message for now
+            raise HTTPException(status_code=500, detail=str(e))
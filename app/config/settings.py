@@ -1,10 +1,16 @@
 # app/config/settings.py
 
+import sys
+import tempfile
+
 from pathlib import Path
+
+import httpx
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
-from openai import OpenAI
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, OpenAI
 
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 ENV_PATH = PROJECT_ROOT / ".env"
@@ -17,6 +23,18 @@ class Settings(BaseSettings):
     stt_model: str = "gpt-4o-mini-transcribe"       # speech-to-text model
     summary_model: str = "gpt-4o-mini"
 
+    # Upload limits
+    max_upload_bytes: int = 200 * 1024 * 1024
+
+    # --- LLM response cache ---
+    llm_cache_backend: str = "memory"               # "memory" or "redis"
+    llm_cache_ttl_seconds: int = 3600
+    llm_cache_redis_url: str = "redis://localhost:6379/0"
+    # Absolute, writable default: the container runs as a non-root user whose
+    # WORKDIR is read-only, so a bare relative path would fail at import.
+    # Point this at a mounted volume to keep the cache across restarts.
+    disk_cache_path: str = str(Path(tempfile.gettempdir()) / "multipurpose_gpt_cache.db")
+
     # --- Ollama / DeepSeek ---
     ollama_url: str | None = None
     ollama_model: str = "deepseek-llm:7b"
@@ -36,8 +54,18 @@ class Settings(BaseSettings):
 # Instantiate settings
 settings = Settings()
 
-# Create OpenAI client (singleton)
+# Create OpenAI clients (singletons): sync for threadpool paths, async for
+# services that run directly on the event loop. The async transport speaks
+# HTTP/2 so concurrent calls multiplex over one TLS connection instead of
+# each paying its own handshake.
 client = OpenAI(api_key=settings.openai_api_key)
+aclient = AsyncOpenAI(
+    api_key=settings.openai_api_key,
+    http_client=DefaultAsyncHttpxClient(
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=64, max_connections=256),
+    ),
+)
 
 DEFAULT_PROMPT = """
 You are an expert summariser across all file types (text, audio, video, image, PDFs, Office docs, spreadsheets).
@@ -66,8 +94,10 @@ For audio or video: describe the spoken content, important points, and context i
 If parts are unreadable or corrupted, don't include them in the summary, without speculating about missing content.
 Tone must be neutral, factual, and informative. Do not add opinions or speculation.
 OUTPUT EXAMPLE (shape only):
-{"summary": "…"} 
+{"summary": "…"}
 """.strip()
+# Interned: the same object is handed out on every fallback request
+DEFAULT_PROMPT = sys.intern(DEFAULT_PROMPT)
 
 def choose_prompt(user_prompt: str | None) -> str:
     """
@@ -0,0 +1,97 @@
+# app/core/batcher.py
+
+import asyncio
+import json
+
+from app.config.settings import aclient
+
+BATCH_MAX_SIZE = 8
+
+
+class ResponseBatcher:
+    """
+    Coalesce concurrent Responses API calls into grouped flushes.
+
+    Callers enqueue their request kwargs and await a future; a background task
+    drains whatever is queued in the same scheduling burst and fires the group
+    concurrently. A lone request flushes immediately — no artificial wait is
+    ever added. Within a group, byte-identical requests (same model and input)
+    collapse onto a single upstream call and the shared result is fanned out
+    to every waiting future.
+    """
+
+    def __init__(self, max_size: int = BATCH_MAX_SIZE):
+        self._max_size = max_size
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task: asyncio.Task | None = None
+        self._flushes: set[asyncio.Task] = set()
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+    async def submit(self, **kwargs):
+        """
+        Enqueue one responses.create call and await its result.
+        Falls back to a direct call when the batcher is not running
+        (e.g. services used outside the app lifespan).
+        """
+        if self._task is None:
+            return await aclient.responses.create(**kwargs)
+        fut = asyncio.get_running_loop().create_future()
+        await self._queue.put((kwargs, fut))
+        return await fut
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            # Drain only what is already queued: concurrent submissions from
+            # the same event-loop pass group together, a solo request goes
+            # straight out.
+            while len(batch) < self._max_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            # Flush in a separate task so slow upstream calls never stall
+            # collection of the next batch.
+            task = asyncio.create_task(self._flush(batch))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    @staticmethod
+    async def _flush(batch: list) -> None:
+        # Identical concurrent requests share one upstream call
+        groups: dict[str, tuple[dict, list[asyncio.Future]]] = {}
+        for kwargs, fut in batch:
+            key = json.dumps(kwargs, sort_keys=True, separators=(",", ":"), default=str)
+            groups.setdefault(key, (kwargs, []))[1].append(fut)
+
+        keys = list(groups)
+        results = await asyncio.gather(
+            *[aclient.responses.create(**groups[key][0]) for key in keys],
+            return_exceptions=True,
+        )
+        for key, result in zip(keys, results):
+            for fut in groups[key][1]:
+                if fut.cancelled():
+                    continue
+                if isinstance(result, BaseException):
+                    fut.set_exception(result)
+                else:
+                    fut.set_result(result)
+
+
+# Shared instance, started/stopped from the app lifespan in app/main.py
+batcher = ResponseBatcher()
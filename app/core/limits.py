@@ -0,0 +1,35 @@
+# app/core/limits.py
+
+from fastapi.responses import ORJSONResponse
+
+
+class MaxBodySizeMiddleware:
+    """
+    Reject oversize requests from the declared Content-Length at request
+    start, before any body bytes are read. Checking inside the handler is too
+    late: FastAPI resolves the Form/File parameters first, which drains and
+    spools the whole multipart body. Pure ASGI (no BaseHTTPMiddleware) so
+    accepted requests pay only a header scan.
+    """
+
+    def __init__(self, app, max_bytes: int):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            for name, value in scope["headers"]:
+                if name == b"content-length":
+                    try:
+                        length = int(value)
+                    except ValueError:
+                        length = 0
+                    if length > self.max_bytes:
+                        response = ORJSONResponse(
+                            {"detail": f"Request too large. Limit is {self.max_bytes} bytes."},
+                            status_code=413,
+                        )
+                        await response(scope, receive, send)
+                        return
+                    break
+        await self.app(scope, receive, send)
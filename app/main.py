@@ -1,20 +1,50 @@
 # app/main.py
 
+import asyncio
+
+try:
+    # libuv event loop: roughly halves per-call loop overhead
+    import uvloop
+    uvloop.install()
+except ImportError:  # pragma: no cover - e.g. Windows dev box
+    pass
+
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.openapi.utils import get_openapi
+from fastapi.responses import ORJSONResponse
 
 from app.api.routes import router as api_router
+from app.config.settings import settings
+from app.core.batcher import batcher
+from app.core.limits import MaxBodySizeMiddleware
 
 API_TITLE = "Multipurpose GPT"
 API_VERSION = "1.0.0"
 API_DESCRIPTION = "Single endpoint to ask GPT with an optional file upload."
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Coalesces bursts of text requests into grouped OpenAI calls
+    await batcher.start()
+    # Pre-build the LibreOffice profile so the first doc conversion is warm
+    from app.services.doc_service import warm_up_soffice
+    await asyncio.to_thread(warm_up_soffice)
+    yield
+    await batcher.stop()
+
 app = FastAPI(
     title=API_TITLE,
     version=API_VERSION,
     description=API_DESCRIPTION,
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
+# Oversize uploads are refused before any body bytes are read
+app.add_middleware(MaxBodySizeMiddleware, max_bytes=settings.max_upload_bytes)
+
 # Mount API routes
 app.include_router(api_router, prefix="/api")
 
@@ -43,3 +73,7 @@ def custom_openapi():
     return app.openapi_schema
 
 app.openapi = custom_openapi
+
+# Build the schema once at import: workers fork with it already materialised
+# (copy-on-write shares the pages) and the first /docs hit doesn't pay for it.
+custom_openapi()
@@ -2,18 +2,94 @@
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import os
 import shutil
 import subprocess
 import tempfile
+import threading
+import time
 from pathlib import Path
 
-from app.config.settings import settings, client
+from app.config.settings import settings, aclient
+from app.utils.retry import full_jitter_delay, is_retryable, status_from_exc
 
+# Content-hash -> uploaded OpenAI file_id, so re-uploads of an identical
+# document skip both the LibreOffice conversion and the multi-MB POST.
+# TTL stays comfortably inside OpenAI's file retention window.
+_FILE_ID_CACHE: dict[str, tuple[str, float]] = {}
+_FILE_ID_CACHE_LOCK = threading.Lock()
+_FILE_ID_TTL_SECONDS = 24 * 3600
 
-def _ensure_pdf(src_path: Path) -> Path:
+
+def _digest_file(path: Path) -> str:
+    with open(path, "rb") as f:
+        return hashlib.file_digest(
+            f, lambda: hashlib.blake2b(digest_size=16)
+        ).hexdigest()
+
+
+def _cached_file_id(digest: str) -> str | None:
+    with _FILE_ID_CACHE_LOCK:
+        entry = _FILE_ID_CACHE.get(digest)
+        if entry is None:
+            return None
+        file_id, stored_at = entry
+        if time.monotonic() - stored_at > _FILE_ID_TTL_SECONDS:
+            del _FILE_ID_CACHE[digest]
+            return None
+        return file_id
+
+
+def _store_file_id(digest: str, file_id: str) -> None:
+    with _FILE_ID_CACHE_LOCK:
+        _FILE_ID_CACHE[digest] = (file_id, time.monotonic())
+
+
+def _evict_file_id(digest: str) -> None:
+    with _FILE_ID_CACHE_LOCK:
+        _FILE_ID_CACHE.pop(digest, None)
+
+
+# Reused across conversions: without a fixed profile dir, every soffice run
+# re-initialises a fresh user profile (fonts, registry, extensions) which is
+# the bulk of its 1-3s cold start.
+_SOFFICE_PROFILE = Path(tempfile.gettempdir()) / "multipurpose_gpt_soffice"
+
+
+def _soffice_profile_arg() -> str:
+    _SOFFICE_PROFILE.mkdir(exist_ok=True)
+    return f"-env:UserInstallation={_SOFFICE_PROFILE.as_uri()}"
+
+
+def warm_up_soffice() -> None:
+    """
+    Pre-build the LibreOffice user profile at startup so the first real
+    conversion doesn't pay the profile-initialisation cost. No-op when
+    LibreOffice isn't installed (e.g. local dev without docs support).
+    """
+    if not shutil.which("soffice"):
+        return
+    cmd = ["soffice", "--headless", _soffice_profile_arg(), "--terminate_after_init"]
+    try:
+        subprocess.run(cmd, capture_output=True, timeout=60)
+    except Exception:
+        # Warm-up is best-effort; conversion still works without it
+        pass
+
+
+# Cap concurrent soffice processes at the core count: the wait is a true
+# async OS wait (no threadpool thread pinned for up to 2 minutes), and the
+# semaphore stops a burst of uploads from forking a process storm.
+_SOFFICE_SEM = asyncio.Semaphore(os.cpu_count() or 2)
+_SOFFICE_TIMEOUT_SECONDS = 120
+
+
+async def _ensure_pdf(src_path: Path, out_dir: Path) -> Path:
     """
     If src is PDF, return it. Otherwise, convert to PDF via LibreOffice headless.
-    Returns the path to a PDF inside the same (temporary) directory.
+    Returns the path to a PDF inside `out_dir` (a temporary directory).
     """
     if src_path.suffix.lower() == ".pdf":
         return src_path
@@ -21,15 +97,29 @@ def _ensure_pdf(src_path: Path) -> Path:
     if not shutil.which("soffice"):
         raise RuntimeError("LibreOffice not found. Install: sudo apt-get install -y libreoffice")
 
-    out_dir = src_path.parent  # keep outputs in the same temp dir
     cmd = [
-        "soffice", "--headless", "--convert-to", "pdf",
+        "soffice", "--headless", _soffice_profile_arg(),
+        "--convert-to", "pdf",
         "--outdir", str(out_dir), str(src_path),
     ]
-    # Timeout guards against corrupt files hanging soffice
-    res = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
-    if res.returncode != 0:
-        err = (res.stderr or res.stdout or "").strip()
+    async with _SOFFICE_SEM:
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            # Timeout guards against corrupt files hanging soffice
+            stdout, stderr = await asyncio.wait_for(
+                proc.communicate(), timeout=_SOFFICE_TIMEOUT_SECONDS
+            )
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.communicate()
+            raise RuntimeError("LibreOffice conversion timed out.")
+
+    if proc.returncode != 0:
+        err = (stderr or stdout or b"").decode(errors="replace").strip()
         raise RuntimeError(f"LibreOffice conversion failed: {err}")
 
     pdf_path = out_dir / (src_path.stem + ".pdf")
@@ -38,46 +128,74 @@ def _ensure_pdf(src_path: Path) -> Path:
     return pdf_path
 
 
-def summarise_document_file(
-    file_bytes: bytes,
+async def _convert_and_upload(src_path: Path) -> str:
+    """Convert to PDF if needed, upload (purpose=user_data), return the file_id."""
+    # Work inside an isolated temp directory so we can point soffice --outdir here.
+    with tempfile.TemporaryDirectory(prefix="docsum_") as td:
+        pdf_path = await _ensure_pdf(src_path, Path(td))
+        with pdf_path.open("rb") as f:
+            up = await aclient.files.create(file=f, purpose="user_data")
+    return up.id
+
+
+async def summarise_document_file(
+    src_path: Path,
     filename: str,
     prompt: str | None = None,
     summary_model: str | None = None,
 ) -> str:
     """
-    Save uploaded doc to a temp dir, convert to PDF if needed (via LibreOffice),
+    Convert the uploaded doc to PDF if needed (via LibreOffice),
     upload PDF to OpenAI Files, then summarise using the chosen text model.
 
+    The caller streams the upload to `src_path` (and cleans it up afterwards);
+    we only create the converted PDF here, inside an isolated temp directory.
+    The soffice conversion runs as an async subprocess gated by a CPU-count
+    semaphore; the OpenAI calls go through the async client.
+
     Returns plain-text summary.
     """
-    # Work inside an isolated temp directory so we can point soffice --outdir here.
-    with tempfile.TemporaryDirectory(prefix="docsum_") as td:
-        tmpdir = Path(td)
-
-        # 1) Persist the uploaded file so soffice / uploader can read it
-        suffix = Path(filename).suffix or ".pdf"
-        src_path = tmpdir / f"upload{suffix}"
-        src_path.write_bytes(file_bytes)
-
-        # 2) Ensure we have a PDF for the input_file path
-        pdf_path = _ensure_pdf(src_path)
-
-        # 3) Upload the PDF (purpose=user_data) so Responses can reference it
-        with pdf_path.open("rb") as f:
-            up = client.files.create(file=f, purpose="user_data")
-        file_id = up.id
-
-        # 4) Summarise with user-chosen model; fall back to settings.summary_model
-        eff_model = summary_model or settings.summary_model
-
-        resp = client.responses.create(
-            model=eff_model,
-            input=[{
-                "role": "user",
-                "content": [
-                    {"type": "input_file", "file_id": file_id},
-                    {"type": "input_text", "text": prompt},
-                ],
-            }],
-        )
-        return resp.output_text
+    # Identical uploads short-circuit to the cached OpenAI file_id,
+    # skipping both the conversion and the upload.
+    digest = await asyncio.to_thread(_digest_file, src_path)
+    file_id = _cached_file_id(digest)
+    from_cache = file_id is not None
+
+    if file_id is None:
+        file_id = await _convert_and_upload(src_path)
+        _store_file_id(digest, file_id)
+
+    # Summarise with user-chosen model; fall back to settings.summary_model.
+    # The file is uploaded exactly once: transient failures retry the
+    # Responses call alone, reusing the same file_id rather than re-POSTing
+    # megabytes of PDF per attempt.
+    eff_model = summary_model or settings.summary_model
+
+    max_retries = 3
+    for attempt in range(max_retries):
+        try:
+            resp = await aclient.responses.create(
+                model=eff_model,
+                input=[{
+                    "role": "user",
+                    "content": [
+                        {"type": "input_file", "file_id": file_id},
+                        {"type": "input_text", "text": prompt},
+                    ],
+                }],
+            )
+            return resp.output_text
+        except Exception as e:
+            # A cached file_id can outlive the file on OpenAI's side; on a
+            # 404, drop the stale entry and re-upload once.
+            if from_cache and status_from_exc(e) == 404:
+                _evict_file_id(digest)
+                file_id = await _convert_and_upload(src_path)
+                _store_file_id(digest, file_id)
+                from_cache = False
+                continue
+            if not is_retryable(e) or attempt == max_retries - 1:
+                raise
+            await asyncio.sleep(full_jitter_delay(attempt, 0.5, 8.0))
+
+    raise RuntimeError("Document summarisation failed after retries.")
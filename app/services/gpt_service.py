@@ -2,19 +2,30 @@
 
 from __future__ import annotations
 
-from typing import Optional
-from app.config.settings import client, settings, choose_prompt
+import asyncio
+import io
+import json
 
+from typing import AsyncIterator, Optional
 
-def ask_gpt(
+from app.config.settings import aclient, settings, choose_prompt
+from app.core.batcher import batcher
+from app.services import semantic_cache
+from app.utils import llm_cache
+from app.utils.retry import full_jitter_delay, is_retryable, retry_after_seconds
+
+
+async def ask_gpt(
     *,
     query: Optional[str] = None,
     prompt: Optional[str] = None,
     summary_model: Optional[str] = None,
     max_retries: int = 3,
+    initial_backoff: float = 0.5,
+    max_backoff: float = 8.0,
 ) -> dict:
     """
-    Text-only GPT call.
+    Text-only GPT call (async; runs on the shared AsyncOpenAI client).
 
     Files (video/audio/docs) are already handled by dedicated services before this is invoked.
 
@@ -22,7 +33,9 @@ def ask_gpt(
         query: User input text (required when no file was uploaded). Must be non-empty after trimming.
         prompt: System instruction. If empty/None, the server default from `settings` is used via `choose_prompt`.
         summary_model: The model name to use for the summary; if None, defaults to `settings.summary_model`.
-        max_retries: Number of attempts for transient failures (simple retry loop).
+        max_retries: Number of attempts for transient failures (429/5xx/connection errors).
+        initial_backoff: Base delay in seconds; the backoff cap doubles each attempt.
+        max_backoff: Upper bound on the computed delay.
 
     Returns:
         dict: {"answer": <str>}
@@ -30,37 +43,152 @@ def ask_gpt(
     """
 
     # --- Validate inputs (router already enforces this, but guard anyway) ---
-    if not query or not isinstance(query, str) or not query.strip():
+    if not query or not query.strip():
         raise ValueError("Provide a non-empty query.")
 
     effective_prompt = choose_prompt(prompt)
     effective_model = summary_model or settings.summary_model
 
+    # Byte-identical requests short-circuit to the cached answer
+    cache_key = llm_cache.build_key(
+        kind="ask_gpt",
+        model=effective_model,
+        system=effective_prompt,
+        query=query.strip(),
+    )
+    cached = llm_cache.cache_get(cache_key)
+    if cached is not None:
+        return cached
+
+    # Near-duplicate phrasings settle for one cheap embedding call
+    sem_answer, query_embedding = await semantic_cache.lookup(
+        query.strip(), model=effective_model, system=effective_prompt
+    )
+    if sem_answer is not None:
+        llm_cache.cache_set(cache_key, sem_answer)
+        return sem_answer
+
     messages = [
         {"role": "system", "content": effective_prompt},
         {"role": "user", "content": query.strip()},
     ]
 
     last_err = None
-    for _ in range(max_retries):
+    for attempt in range(max_retries):
         try:
-            resp = client.responses.create(
+            resp = await batcher.submit(
                 model=effective_model,
                 input=messages,
             )
             answer = (resp.output_text or "").strip()
-
-            usage = getattr(resp, "usage", None)
-            # normalise usage to a plain dict if available
-            if hasattr(usage, "model_dump"):
-                usage = usage.model_dump()
-
-            return {"answer": answer}
-            # return {"answer": answer, "model": effective_model, "usage": usage}
+            result = {"answer": answer}
+            llm_cache.cache_set(cache_key, result)
+            semantic_cache.store(
+                query_embedding,
+                model=effective_model,
+                system=effective_prompt,
+                answer=result,
+            )
+            return result
         except Exception as e:
             last_err = e
-            continue  # simple retry; no backoff to keep it minimal
+            if not is_retryable(e) or attempt == max_retries - 1:
+                raise
+            # Honour the server's Retry-After when present; otherwise
+            # full-jitter exponential backoff so retries don't synchronise.
+            delay = retry_after_seconds(e)
+            if delay is None:
+                delay = full_jitter_delay(attempt, initial_backoff, max_backoff)
+            await asyncio.sleep(delay)
 
     # If we’re here, all retries failed
     raise last_err if last_err else RuntimeError("Unknown error calling Responses API")
 
+
+def _batch_output_text(body: dict) -> str:
+    """Extract the concatenated output_text parts from a raw Responses body."""
+    parts = []
+    for item in body.get("output", []):
+        for content in item.get("content", []) or []:
+            if content.get("type") == "output_text":
+                parts.append(content.get("text", ""))
+    return "".join(parts).strip()
+
+
+async def ask_gpt_batch(
+    queries: list[str],
+    *,
+    prompt: Optional[str] = None,
+    summary_model: Optional[str] = None,
+    completion_window: str = "24h",
+    poll_initial: float = 5.0,
+    poll_max: float = 60.0,
+) -> AsyncIterator[dict]:
+    """
+    Bulk, latency-insensitive variant of `ask_gpt` using the OpenAI Batch API
+    (half the per-token price of interactive calls).
+
+    Uploads all queries as one JSONL batch against /v1/responses, polls until
+    the batch finishes, then yields {"query": <str>, "answer": <str>} in
+    submission order. Failed lines yield {"query": ..., "error": <str>}.
+
+    Use for offline pipelines (e.g. summarising a folder of files); the batch
+    can take up to `completion_window` to complete.
+    """
+    if not queries:
+        return
+
+    effective_prompt = choose_prompt(prompt)
+    effective_model = summary_model or settings.summary_model
+
+    lines = []
+    for i, query in enumerate(queries):
+        lines.append(json.dumps({
+            "custom_id": f"req-{i}",
+            "method": "POST",
+            "url": "/v1/responses",
+            "body": {
+                "model": effective_model,
+                "input": [
+                    {"role": "system", "content": effective_prompt},
+                    {"role": "user", "content": query.strip()},
+                ],
+            },
+        }))
+    payload = io.BytesIO("\n".join(lines).encode())
+
+    uploaded = await aclient.files.create(
+        file=("batch.jsonl", payload, "application/jsonl"), purpose="batch"
+    )
+    batch = await aclient.batches.create(
+        input_file_id=uploaded.id,
+        endpoint="/v1/responses",
+        completion_window=completion_window,
+    )
+
+    # Poll with a capped exponential interval: cheap status calls early on,
+    # then settle at poll_max for long-running batches.
+    delay = poll_initial
+    while batch.status in ("validating", "in_progress", "finalizing"):
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, poll_max)
+        batch = await aclient.batches.retrieve(batch.id)
+
+    if batch.status != "completed" or not batch.output_file_id:
+        raise RuntimeError(f"Batch {batch.id} ended with status {batch.status!r}")
+
+    output = await aclient.files.content(batch.output_file_id)
+    by_id: dict[str, dict] = {}
+    for raw in output.text.splitlines():
+        if raw.strip():
+            row = json.loads(raw)
+            by_id[row["custom_id"]] = row
+
+    for i, query in enumerate(queries):
+        row = by_id.get(f"req-{i}")
+        if row is None or row.get("error") or row["response"]["status_code"] != 200:
+            detail = (row or {}).get("error") or (row or {}).get("response", {}).get("body")
+            yield {"query": query, "error": f"batch line failed: {detail}"}
+        else:
+            yield {"query": query, "answer": _batch_output_text(row["response"]["body"])}
+
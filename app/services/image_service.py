@@ -2,50 +2,76 @@
 
 from __future__ import annotations
 
-import base64
-import tempfile
+import asyncio
+import types
 
 from pathlib import Path
 
-from app.config.settings import client, settings
+from app.config.settings import aclient, settings
+from app.utils import disk_cache, llm_cache
 
-_MIME_BY_EXT = {
+# Read-only view: nothing can mutate the table at runtime, and we avoid
+# loading the full mimetypes database for nine extensions.
+_MIME_BY_EXT = types.MappingProxyType({
     ".jpg": "image/jpeg", ".jpeg": "image/jpeg",
     ".png": "image/png",  ".gif": "image/gif",
     ".bmp": "image/bmp",  ".webp": "image/webp",
     ".tiff": "image/tiff",".tif": "image/tiff",
     ".heic": "image/heic",
-}
+})
 
-def _guess_mime(suffix: str) -> str:
-    return _MIME_BY_EXT.get(suffix.lower(), "application/octet-stream")
-
-def summarise_image_file(
-    file_bytes: bytes,
+async def summarise_image_file(
+    src_path: Path,
     filename: str,
     prompt: str | None = None,
     summary_model: str | None = None,
 ) -> str:
     """
-    Send the image via Responses 'input_image' using a data: URL.
-    This avoids 'input_file' (PDF-only) and the invalid 'image' field.
+    Upload the raw image to OpenAI Files (purpose=vision) and reference it by
+    file_id in the Responses 'input_image' part. Compared with the previous
+    base64 data URL this skips the in-memory encode and the 33% wire-size tax.
+    The caller streams the upload to `src_path` (and cleans it up afterwards).
+    Async: only the file hashing runs off the event loop.
     """
-    suffix = Path(filename).suffix or ".png"
-    mime = _guess_mime(suffix)
-
-    # Base64-encode the bytes and wrap as a data URL for image_url
-    b64 = base64.b64encode(file_bytes).decode("utf-8")
-    data_url = f"data:{mime};base64,{b64}"
+    mime = _MIME_BY_EXT.get(
+        Path(filename).suffix.lower(), "application/octet-stream"
+    )
 
     eff_model = summary_model or settings.summary_model
-    resp = client.responses.create(
+
+    # Re-submitting the same image with the same prompt is a dict lookup
+    cache_key = llm_cache.build_key(
+        kind="image",
+        model=eff_model,
+        prompt=prompt or "",
+        file_sha=await asyncio.to_thread(llm_cache.hash_file_sha256, src_path),
+    )
+    cached = llm_cache.cache_get(cache_key)
+    if cached is not None:
+        return cached
+
+    # Second layer: persistent across restarts
+    cached = await asyncio.to_thread(disk_cache.cache.get, cache_key)
+    if cached is not None:
+        llm_cache.cache_set(cache_key, cached)
+        return cached
+
+    # Stream the raw bytes from the open handle; httpx chunks the upload
+    with open(src_path, "rb") as f:
+        uploaded = await aclient.files.create(
+            file=(filename, f, mime), purpose="vision"
+        )
+
+    resp = await aclient.responses.create(
         model=eff_model,
         input=[{
             "role": "user",
             "content": [
                 {"type": "input_text", "text": (prompt or "")},
-                {"type": "input_image", "image_url": data_url},
+                {"type": "input_image", "file_id": uploaded.id},
             ],
         }],
     )
+    llm_cache.cache_set(cache_key, resp.output_text)
+    await asyncio.to_thread(disk_cache.cache.set, cache_key, resp.output_text)
     return resp.output_text
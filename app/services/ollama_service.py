@@ -2,25 +2,35 @@
 
 from __future__ import annotations
 
+import asyncio
+import atexit
+import time
+
 import httpx
 
 from typing import Optional
 
 from app.config.settings import settings, choose_prompt
+from app.utils import llm_cache
+from app.utils.retry import full_jitter_delay, is_retryable_status
 
 class OllamaError(RuntimeError):
     pass
 
-def ask_ollama(
-    *,
-    query: str,
-    prompt: Optional[str] = None,
-    timeout: float = 60.0,
-) -> dict:
-    """
-    Send a text-only chat request to an Ollama server (DeepSeek 7B).
-    Returns: {"answer": "<text>"} to match your ask_gpt shape.
-    """
+# Module-level pooled clients: connection keep-alive means every call after
+# the first skips the TCP+TLS handshake instead of paying it per request.
+_LIMITS = httpx.Limits(
+    max_keepalive_connections=20,
+    max_connections=100,
+    keepalive_expiry=30.0,
+)
+_HTTP = httpx.Client(timeout=60.0, verify=True, limits=_LIMITS)
+_AHTTP = httpx.AsyncClient(timeout=60.0, verify=True, limits=_LIMITS)
+
+atexit.register(_HTTP.close)
+
+def _prepare(query: str, prompt: Optional[str]) -> tuple[dict, str | None, str]:
+    """Build the chat payload, cache key and URL shared by both entry points."""
     if not settings.ollama_url:
         raise OllamaError("OLLAMA_URL not configured.")
 
@@ -43,13 +53,97 @@ def ask_ollama(
         },
     }
 
+    # Byte-identical requests (same query, prompt, model and options)
+    # short-circuit to the cached answer — but only when sampling is
+    # deterministic. With temperature > 0 the answer is randomly drawn, and
+    # freezing one draw for the TTL would be a visible behaviour change.
+    cache_key = None
+    if settings.ollama_temperature == 0:
+        cache_key = llm_cache.build_key(
+            kind="ollama",
+            model=model,
+            system=system_prompt,
+            query=query.strip(),
+            options=payload["options"],
+        )
     url = settings.ollama_url.rstrip("/") + "/api/chat"
-    # Use httpx for timeouts and nice errors
-    with httpx.Client(timeout=timeout, verify=True) as client:
-        resp = client.post(url, json=payload)
-    if resp.status_code != 200:
-        raise OllamaError(f"Ollama error {resp.status_code}: {resp.text}")
+    return payload, cache_key, url
 
+def _parse(resp: httpx.Response, cache_key: str | None) -> dict:
     data = resp.json()
     msg = (data.get("message") or {}).get("content", "")
-    return {"answer": msg.strip()}
+    result = {"answer": msg.strip()}
+    if cache_key is not None:
+        llm_cache.cache_set(cache_key, result)
+    return result
+
+def ask_ollama(
+    *,
+    query: str,
+    prompt: Optional[str] = None,
+    timeout: float = 60.0,
+    max_retries: int = 3,
+    initial_backoff: float = 0.5,
+    max_backoff: float = 8.0,
+) -> dict:
+    """
+    Send a text-only chat request to an Ollama server (DeepSeek 7B).
+    Returns: {"answer": "<text>"} to match your ask_gpt shape.
+    """
+    payload, cache_key, url = _prepare(query, prompt)
+    if cache_key is not None:
+        cached = llm_cache.cache_get(cache_key)
+        if cached is not None:
+            return cached
+
+    # Transient failures (connection drops, 429/5xx) retry with full-jitter
+    # backoff so clients de-correlate.
+    for attempt in range(max_retries):
+        try:
+            resp = _HTTP.post(url, json=payload, timeout=timeout)
+        except httpx.TransportError as e:
+            if attempt == max_retries - 1:
+                raise OllamaError(f"Ollama unreachable: {e}") from e
+            time.sleep(full_jitter_delay(attempt, initial_backoff, max_backoff))
+            continue
+        if resp.status_code == 200:
+            return _parse(resp, cache_key)
+        if not is_retryable_status(resp.status_code) or attempt == max_retries - 1:
+            raise OllamaError(f"Ollama error {resp.status_code}: {resp.text}")
+        time.sleep(full_jitter_delay(attempt, initial_backoff, max_backoff))
+
+    raise OllamaError("Ollama request failed after retries.")
+
+async def ask_ollama_async(
+    *,
+    query: str,
+    prompt: Optional[str] = None,
+    timeout: float = 60.0,
+    max_retries: int = 3,
+    initial_backoff: float = 0.5,
+    max_backoff: float = 8.0,
+) -> dict:
+    """
+    Async twin of ask_ollama for use on the event loop (FastAPI handlers).
+    """
+    payload, cache_key, url = _prepare(query, prompt)
+    if cache_key is not None:
+        cached = llm_cache.cache_get(cache_key)
+        if cached is not None:
+            return cached
+
+    for attempt in range(max_retries):
+        try:
+            resp = await _AHTTP.post(url, json=payload, timeout=timeout)
+        except httpx.TransportError as e:
+            if attempt == max_retries - 1:
+                raise OllamaError(f"Ollama unreachable: {e}") from e
+            await asyncio.sleep(full_jitter_delay(attempt, initial_backoff, max_backoff))
+            continue
+        if resp.status_code == 200:
+            return _parse(resp, cache_key)
+        if not is_retryable_status(resp.status_code) or attempt == max_retries - 1:
+            raise OllamaError(f"Ollama error {resp.status_code}: {resp.text}")
+        await asyncio.sleep(full_jitter_delay(attempt, initial_backoff, max_backoff))
+
+    raise OllamaError("Ollama request failed after retries.")
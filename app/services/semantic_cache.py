@@ -0,0 +1,78 @@
+# app/services/semantic_cache.py
+
+"""
+Embedding-based semantic cache for text queries.
+
+Sits below the exact-match cache in ask_gpt: near-duplicate phrasings of the
+same question ("How do I deploy to AWS?" vs "Process for AWS deploy?") cost
+one cheap embedding call instead of a full completion. Cached query
+embeddings are L2-normalised and kept in a NumPy matrix, so a lookup is a
+single matrix-vector product; entries are evicted FIFO at capacity.
+"""
+
+from __future__ import annotations
+
+import threading
+
+import numpy as np
+
+from app.config.settings import aclient
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+SIMILARITY_THRESHOLD = 0.90
+MAX_ENTRIES = 1000
+
+_lock = threading.Lock()
+# Parallel structures: row i of _matrix is the embedding for _entries[i]
+_matrix: np.ndarray | None = None
+_entries: list[dict] = []
+
+
+async def _embed(query: str) -> np.ndarray:
+    resp = await aclient.embeddings.create(model=EMBEDDING_MODEL, input=query)
+    vec = np.asarray(resp.data[0].embedding, dtype=np.float32)
+    norm = float(np.linalg.norm(vec))
+    return vec / norm if norm else vec
+
+
+async def lookup(query: str, *, model: str, system: str) -> tuple[dict | None, np.ndarray | None]:
+    """
+    Return (cached_answer, query_embedding). The embedding is handed back so
+    a subsequent store() doesn't pay a second embedding call; it is None when
+    the embedding call itself failed (in which case the caller just proceeds
+    uncached).
+    """
+    try:
+        vec = await _embed(query)
+    except Exception:
+        return None, None
+
+    with _lock:
+        if _matrix is not None and len(_entries):
+            sims = _matrix @ vec
+            # Mask out rows from other models/prompts before taking the
+            # argmax: a foreign entry scoring highest must not shadow a
+            # same-model entry that clears the threshold.
+            for i, entry in enumerate(_entries):
+                if entry["model"] != model or entry["system"] != system:
+                    sims[i] = -1.0
+            best = int(np.argmax(sims))
+            if float(sims[best]) >= SIMILARITY_THRESHOLD:
+                return _entries[best]["answer"], vec
+    return None, vec
+
+
+def store(embedding: np.ndarray | None, *, model: str, system: str, answer: dict) -> None:
+    if embedding is None:
+        return
+    global _matrix
+    row = embedding.reshape(1, -1)
+    with _lock:
+        if _matrix is None:
+            _matrix = row
+        else:
+            if len(_entries) >= MAX_ENTRIES:
+                _matrix = _matrix[1:]
+                _entries.pop(0)
+            _matrix = np.vstack((_matrix, row))
+        _entries.append({"model": model, "system": system, "answer": answer})
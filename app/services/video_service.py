@@ -1,60 +1,136 @@
 # app/services/video_service.py
 
-import shlex
+import asyncio
+import io
 import subprocess
+import tempfile
 
 from pathlib import Path
-from tempfile import NamedTemporaryFile
 
-from app.config.settings import settings, client
+from app.config.settings import settings, aclient
+from app.utils import disk_cache, llm_cache
+from app.utils.retry import full_jitter_delay, is_retryable
 
-def summarise_video(
-        file_bytes: bytes,
+
+async def _call_with_retries(coro_factory, *, max_retries: int = 3,
+                             initial_backoff: float = 0.5, max_backoff: float = 8.0):
+    """Retry an async OpenAI call on transient failures with full-jitter backoff."""
+    for attempt in range(max_retries):
+        try:
+            return await coro_factory()
+        except Exception as e:
+            if not is_retryable(e) or attempt == max_retries - 1:
+                raise
+            await asyncio.sleep(full_jitter_delay(attempt, initial_backoff, max_backoff))
+
+
+# Extracted audio above this size is split so the transcriptions run in
+# parallel (and each segment stays under the STT upload limit); 10 minutes of
+# 16 kHz mono WAV is ~19 MiB. The semaphore respects upstream rate limits.
+_SEGMENT_THRESHOLD_BYTES = 20 * 1024 * 1024
+_SEGMENT_SECONDS = 600
+_TRANSCRIBE_CONCURRENCY = 8
+
+
+def _extract_audio(src_path: Path) -> io.BytesIO:
+    # WAV straight to stdout: no temp file round-trip, no shell parser
+    cmd = [
+        "ffmpeg", "-i", str(src_path),
+        "-vn", "-ac", "1", "-ar", "16000",
+        "-f", "wav", "pipe:1",
+    ]
+    proc = subprocess.run(cmd, check=True,
+                          stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    return io.BytesIO(proc.stdout)
+
+
+def _split_wav(wav_bytes: bytes, out_dir: Path) -> list[Path]:
+    """
+    Split already-extracted WAV into fixed-length segments via stream copy.
+    Returns the segment paths in playback order.
+    """
+    pattern = out_dir / "segment_%03d.wav"
+    cmd = [
+        "ffmpeg", "-f", "wav", "-i", "pipe:0",
+        "-f", "segment", "-segment_time", str(_SEGMENT_SECONDS),
+        "-c", "copy", "-y", str(pattern),
+    ]
+    subprocess.run(cmd, input=wav_bytes, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return sorted(out_dir.glob("segment_*.wav"))
+
+
+async def summarise_video(
+        src_path: Path,
         filename: str,
         prompt: str | None = None,
         summary_model: str | None = None
     ) -> str:
     """
     Extract audio from uploaded video, transcribe, and summarise.
+    The caller streams the upload to `src_path` (and cleans it up afterwards);
+    the extracted WAV never touches disk — ffmpeg pipes it to memory. The
+    ffmpeg step runs off the event loop; the OpenAI calls go through the
+    async client.
     """
-    with NamedTemporaryFile(delete=False, suffix=Path(filename).suffix) as tmp_vid:
-        tmp_vid.write(file_bytes)
-        video_path = Path(tmp_vid.name)
-
-    audio_path = video_path.with_suffix(".wav")
-
-    try:
-        # --- Extract audio ---
-        cmd = (
-            f'ffmpeg -i {shlex.quote(str(video_path))} '
-            f'-vn -ac 1 -ar 16000 -y {shlex.quote(str(audio_path))}'
-        )
-        subprocess.run(cmd, shell=True, check=True,
-                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-
-        # --- Transcribe ---
-        with open(audio_path, "rb") as f:
-            stt = client.audio.transcriptions.create(
+    effective_model = summary_model or settings.summary_model
+
+    # Content-addressed and persistent: re-uploading the same video with the
+    # same prompt skips ffmpeg, transcription and summarisation entirely.
+    cache_key = llm_cache.build_key(
+        kind="video",
+        model=effective_model,
+        prompt=prompt or "",
+        file_sha=await asyncio.to_thread(llm_cache.hash_file_sha256, src_path),
+    )
+    cached = await asyncio.to_thread(disk_cache.cache.get, cache_key)
+    if cached is not None:
+        return cached
+
+    # --- Extract audio ---
+    audio_buf = await asyncio.to_thread(_extract_audio, src_path)
+
+    # --- Transcribe ---
+    if audio_buf.getbuffer().nbytes > _SEGMENT_THRESHOLD_BYTES:
+        # Long audio: wall time becomes the slowest segment, not the sum
+        sem = asyncio.Semaphore(_TRANSCRIBE_CONCURRENCY)
+
+        async def _transcribe_segment(seg_path: Path) -> str:
+            async def _once():
+                with open(seg_path, "rb") as f:
+                    return await aclient.audio.transcriptions.create(
+                        model=settings.stt_model,
+                        file=f,
+                    )
+
+            async with sem:
+                stt = await _call_with_retries(_once)
+                return stt.text
+
+        with tempfile.TemporaryDirectory(prefix="vidseg_") as td:
+            segments = await asyncio.to_thread(
+                _split_wav, audio_buf.getvalue(), Path(td)
+            )
+            texts = await asyncio.gather(*[_transcribe_segment(p) for p in segments])
+        transcript = " ".join(texts)
+    else:
+        async def _transcribe():
+            # Rewind per attempt so a retry never resends a drained buffer
+            audio_buf.seek(0)
+            return await aclient.audio.transcriptions.create(
                 model=settings.stt_model,
-                file=f,
+                file=("audio.wav", audio_buf, "audio/wav"),
             )
-        transcript = stt.text
 
-        # --- Summarise ---
-        effective_model = summary_model or settings.summary_model
-
-        resp = client.responses.create(
-            model=effective_model,
-            input=f"{prompt}\n\nTRANSCRIPT:\n{transcript}",
-        )
+        stt = await _call_with_retries(_transcribe)
+        transcript = stt.text
 
-        return resp.output_text
+    # --- Summarise ---
+    resp = await _call_with_retries(lambda: aclient.responses.create(
+        model=effective_model,
+        input=f"{prompt}\n\nTRANSCRIPT:\n{transcript}",
+    ))
 
-    finally:
-        # Cleanup
-        for p in (video_path, audio_path):
-            try:
-                if p.exists():
-                    p.unlink()
-            except Exception:
-                pass
+    summary = resp.output_text
+    await asyncio.to_thread(disk_cache.cache.set, cache_key, summary)
+    return summary
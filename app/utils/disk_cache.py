@@ -0,0 +1,74 @@
+# app/utils/disk_cache.py
+
+"""
+Persistent SQLite-backed cache for expensive summaries.
+
+The in-process LLM cache dies with the worker; video summarisation (ffmpeg +
+STT + GPT) is far too expensive to redo after a restart. Entries are keyed on
+a content hash (file bytes + prompt + model, built by the callers) and the
+answers are zstd-compressed, so re-uploading the same asset is a few
+milliseconds and zero API spend for as long as the row exists.
+"""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+import time
+
+import zstandard
+
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class DiskCache:
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._compressor = zstandard.ZstdCompressor(level=3)
+        self._decompressor = zstandard.ZstdDecompressor()
+        # Fail soft: an unwritable path degrades to no persistence rather
+        # than an import error that would take the media routes down with it.
+        try:
+            # check_same_thread=False + a lock: callers run in threadpool workers
+            conn = sqlite3.connect(path, check_same_thread=False)
+            # WAL so concurrent readers never block behind a writer
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value BLOB, created_at REAL)"
+            )
+            conn.commit()
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("Disk cache disabled: cannot open %s (%s)", path, e)
+            self._conn = None
+        else:
+            self._conn = conn
+
+    def get(self, key: str) -> str | None:
+        if self._conn is None:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return self._decompressor.decompress(row[0]).decode("utf-8")
+
+    def set(self, key: str, value: str) -> None:
+        if self._conn is None:
+            return
+        blob = self._compressor.compress(value.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, created_at) VALUES (?, ?, ?)",
+                (key, blob, time.time()),
+            )
+            self._conn.commit()
+
+
+# Shared instance; path is configurable so deployments can mount a volume
+cache = DiskCache(settings.disk_cache_path)
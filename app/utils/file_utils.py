@@ -1,5 +1,13 @@
 # app/utils/file_utils.py
 
+import os
+import shutil
+import sys
+
+from functools import lru_cache
+from pathlib import Path
+from typing import BinaryIO
+
 VIDEO_EXTS  = {"mp4", "avi", "mov", "wmv", "mpeg", "mpg", "mkv", "flv", "webm", "3gp", "mts", "m2ts", "vob", "rmvb"}
 TEXT_EXTS   = {"txt", "csv", "tsv", "log", "xml", "json", "yaml", "ini",
                "xls", "xlsx", "ods", "doc", "docx", "odt", "rtf", "ppt", "pptx", "odp",
@@ -19,19 +27,55 @@ CATEGORY_BY_EXT = (
     {ext: "archive" for ext in ARCHIVE_EXTS}
 )
 
+# Precomputed so the compound check is one C-level endswith over all suffixes
+_COMPOUND_SUFFIXES = tuple("." + c for c in COMPOUND_ARCHIVE_EXTS)
+
+
+@lru_cache(maxsize=4096)
 def extract_ext_category(filename: str) -> tuple[str | None, str | None]:
-    name = (filename or "").lower()
+    # Filenames repeat heavily in practice, so memoise the whole
+    # classification; the body itself is a couple of C-level calls.
+    if not filename:
+        return None, None
+
+    tail = filename.lower()
 
-    for cext in COMPOUND_ARCHIVE_EXTS:
-        if name.endswith("." + cext):
-            return cext, "archive"
+    if tail.endswith(_COMPOUND_SUFFIXES):
+        ext = next(c for c in COMPOUND_ARCHIVE_EXTS if tail.endswith("." + c))
+        return ext, "archive"
 
-    if "." not in name:
+    _, dot, ext = tail.rpartition(".")
+    if not dot:
         return None, None
 
-    ext = name.rsplit(".", 1)[-1]
     cat = CATEGORY_BY_EXT.get(ext)
-    if cat:
-        return ext, cat
-    return None, None
+    return (ext, cat) if cat else (None, None)
+
+
+def persist_upload(fileobj: BinaryIO, dst_path: Path) -> None:
+    """
+    Copy an already-received upload body to `dst_path` without userspace
+    round-trips: on Linux, when the source has a real file descriptor
+    (Starlette spools large bodies to disk), os.sendfile moves the bytes
+    kernel-to-kernel; otherwise shutil.copyfileobj streams in 1 MiB chunks.
+    Blocking — call from a threadpool.
+    """
+    fileobj.seek(0)
+    with open(dst_path, "wb") as out:
+        if sys.platform == "linux":
+            try:
+                in_fd = fileobj.fileno()
+            except (AttributeError, OSError, ValueError):
+                in_fd = None
+            if in_fd is not None:
+                size = os.fstat(in_fd).st_size
+                offset = 0
+                while offset < size:
+                    sent = os.sendfile(out.fileno(), in_fd, offset, size - offset)
+                    if sent == 0:
+                        break
+                    offset += sent
+                if offset >= size:
+                    return
+        shutil.copyfileobj(fileobj, out, length=1 << 20)
 
@@ -0,0 +1,89 @@
+# app/utils/llm_cache.py
+
+"""
+Exact-match TTL cache for LLM responses.
+
+Keys are SHA-256 digests of the canonicalised request (model + system prompt
++ user content + file hash where relevant), so byte-identical requests —
+which dominate dev/test traffic — short-circuit to the stored answer instead
+of paying a full round trip. Backend is an in-process dict by default; set
+LLM_CACHE_BACKEND=redis to share hits across workers.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+
+from pathlib import Path
+from typing import Any
+
+from app.config.settings import settings
+
+
+class _MemoryBackend:
+    def __init__(self, ttl: int):
+        self._ttl = ttl
+        self._store: dict[str, tuple[Any, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            entry = self._store.get(key)
+            if entry is None:
+                return None
+            value, stored_at = entry
+            if time.monotonic() - stored_at > self._ttl:
+                del self._store[key]
+                return None
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._store[key] = (value, time.monotonic())
+
+
+class _RedisBackend:
+    def __init__(self, ttl: int, url: str):
+        import redis  # optional; only needed when LLM_CACHE_BACKEND=redis
+
+        self._ttl = ttl
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Any | None:
+        raw = self._client.get(key)
+        return json.loads(raw) if raw else None
+
+    def set(self, key: str, value: Any) -> None:
+        self._client.setex(key, self._ttl, json.dumps(value))
+
+
+def _make_backend():
+    if settings.llm_cache_backend == "redis":
+        return _RedisBackend(settings.llm_cache_ttl_seconds, settings.llm_cache_redis_url)
+    return _MemoryBackend(settings.llm_cache_ttl_seconds)
+
+
+_backend = _make_backend()
+
+
+def build_key(**parts: Any) -> str:
+    """Canonicalise the request parts into a stable SHA-256 key."""
+    canon = json.dumps(parts, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canon.encode()).hexdigest()
+
+
+def hash_file_sha256(path: Path) -> str:
+    """SHA-256 of a file via hashlib.file_digest (OpenSSL's accelerated loop)."""
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def cache_get(key: str) -> Any | None:
+    return _backend.get(key)
+
+
+def cache_set(key: str, value: Any) -> None:
+    _backend.set(key, value)
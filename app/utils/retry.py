@@ -0,0 +1,52 @@
+# app/utils/retry.py
+
+"""
+Shared retry policy: one retryability classification and one backoff curve,
+so the OpenAI and Ollama call sites can't drift apart.
+"""
+
+import random
+
+from openai import APIConnectionError, RateLimitError
+
+
+def full_jitter_delay(attempt: int, initial_backoff: float, max_backoff: float) -> float:
+    """
+    AWS-style "full jitter" backoff: uniform over [0, min(cap, initial * 2^attempt)].
+    Fully randomised delays de-correlate retries across clients, so a burst of
+    429s doesn't turn into synchronised retry storms.
+    """
+    cap = min(max_backoff, initial_backoff * (2 ** attempt))
+    return random.uniform(0.0, cap)
+
+
+def is_retryable_status(status: int) -> bool:
+    """Rate limits and server-side failures are worth another attempt."""
+    return status == 429 or status >= 500
+
+
+def status_from_exc(exc: BaseException) -> int | None:
+    return getattr(exc, "status_code", None)
+
+
+def is_retryable(exc: BaseException) -> bool:
+    # Connection drops, timeouts and 429s are transient by definition;
+    # 5xx from the API is worth one more try, anything else is not.
+    if isinstance(exc, (RateLimitError, APIConnectionError)):
+        return True
+    status = status_from_exc(exc)
+    return status is not None and is_retryable_status(status)
+
+
+def retry_after_seconds(exc: BaseException) -> float | None:
+    """Seconds from the server's Retry-After header, if the exception carries one."""
+    response = getattr(exc, "response", None)
+    if response is None:
+        return None
+    retry_after = response.headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return float(retry_after)
+    except ValueError:
+        return None